@@ -2,10 +2,10 @@ import os
 import re
 import json
 import gpxpy
-import folium
 from datetime import datetime
 from collections import defaultdict
-from templates import details_template, frontcard_template
+from templates import details_template, frontcard_template, map_template
+from site_output import SiteOutput
 from bs4 import BeautifulSoup
 
 # ---- CONFIG ----
@@ -15,18 +15,47 @@ OUTPUT_DIR    = os.path.join(BASE_DIR, "courses")
 INDEX_HTML    = os.path.join(BASE_DIR, "index.html")
 CALENDAR_HTML = os.path.join(BASE_DIR, "calendar.html")
 EVENT_MAP_HTML= os.path.join(BASE_DIR, "event_map.html")
+CATALOGUE_JSON= os.path.join(BASE_DIR, "catalogue.json")
 EVENTS_JSON   = os.path.join(BASE_DIR, "data", "events.json")
 
 # ensure output
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
+# every page goes through here; nothing is swapped in until out.commit()
+out = SiteOutput(BASE_DIR)
+
 # gpx filename pattern
 pattern = re.compile(r"(?P<critname>.+?)_crit_(?P<year>\d{4})\.gpx")
 
+# race series are recognised by their (uppercase) prefix in the crit name
+SERIES = {"ToAD","CBR"}
+
+# stats.json label -> short catalogue field
+CATALOGUE_STATS = {
+    "Lap Distance (km)":    "km",
+    "Lap Distance (mi)":    "mi",
+    "Elevation Gain (m)":   "gain_m",
+    "Elevation Gain (ft)":  "gain_ft",
+    "Climb Density (m/km)": "density",
+    "Average Gradient (%)": "avg_grad",
+    "Max Gradient (%)":     "max_grad",
+    "Min Gradient (%)":     "min_grad",
+}
+CATALOGUE_FIELDS = ["folder", "raw", "name", "year", "state", "series", *CATALOGUE_STATS.values()]
+
 # helpers
 def fix_case(raw):
-    special = {"ToAD","CBR"}
-    return " ".join(w if w in special else w.capitalize() for w in raw.replace("_"," ").split())
+    return " ".join(w if w in SERIES else w.capitalize() for w in raw.replace("_"," ").split())
+
+def get_series(raw):
+    first = raw.replace("_"," ").split()[0] if raw.strip() else ""
+    return first if first in SERIES else ""
+
+def to_number(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
 
 def get_start_point(path):
     with open(path, encoding="utf-8") as f:
@@ -41,7 +70,6 @@ def get_start_point(path):
 
 # collect everything
 course_info = []
-states = set()
 crit_locations = []
 
 for fn in os.listdir(GPX_DIR):
@@ -56,16 +84,17 @@ for fn in os.listdir(GPX_DIR):
     folder = f"{raw}_{year}"
     gp = os.path.join(GPX_DIR, fn)
     od = os.path.join(OUTPUT_DIR, folder)
-    os.makedirs(od, exist_ok=True)
 
     # generate details + frontcard
-    details_template.process_course(gpx_path=gp, output_dir=od, critname=raw, year=year)
-    frontcard_template.process_frontcard(gpx_path=gp, output_dir=od, critname=raw, year=year)
+    stats = details_template.process_course(gpx_path=gp, output_dir=od, critname=raw, year=year, out=out)
+    frontcard_template.process_frontcard(gpx_path=gp, output_dir=od, critname=raw, year=year, out=out)
 
-    # load stats for state
-    with open(os.path.join(od, f"{raw}_crit_{year}_stats.json"), encoding="utf-8") as sf:
-        st = json.load(sf).get("State","Unknown").replace(" ","_")
-    states.add(st)
+    # stats for the catalogue (fall back to the last build's if this one was skipped)
+    stats_path = os.path.join(od, f"{raw}_crit_{year}_stats.json")
+    if stats is None and os.path.exists(stats_path):
+        with open(stats_path, encoding="utf-8") as sf:
+            stats = json.load(sf)
+    stats = stats or {}
 
     # grab start for event map
     sp = get_start_point(gp)
@@ -84,37 +113,41 @@ for fn in os.listdir(GPX_DIR):
         "nice": nice,
         "raw": raw,
         "year": year,
-        "state": st
+        "stats": stats
     })
 
 # sort
 course_info.sort(key=lambda c: c["nice"].lower())
 
-# --- INDEX.HTML ---
-cards = []
+# --- CATALOGUE.JSON ---
+# one compact file with every course + its stats, so the index can filter/sort
+# without fetching each course. Columnar layout keeps it small for big archives.
+rows = []
 for c in course_info:
-    cards.append(f"""
-    <a href="courses/{c['folder']}/{c['raw']}_crit_{c['year']}_details.html"
-       class="course-card" data-state="{c['state']}">
-      <div class="card-header">
-        <h3 class="card-title">{c['nice']} Crit</h3>
-        <p class="card-year">{c['year']}</p>
-      </div>
-      <div class="card-map">
-        <iframe src="courses/{c['folder']}/{c['raw']}_crit_{c['year']}_frontcard.html"
-                loading="lazy"></iframe>
-      </div>
-    </a>
-    """)
-
-with open(INDEX_HTML, "w", encoding="utf-8") as f:
-    f.write(f"""<!DOCTYPE html>
+    rows.append([
+        c["folder"],
+        c["raw"],
+        c["nice"],
+        int(c["year"]),
+        c["stats"].get("State","Unknown"),
+        get_series(c["raw"]),
+        *(to_number(c["stats"].get(label)) for label in CATALOGUE_STATS),
+    ])
+
+out.write(CATALOGUE_JSON, json.dumps({"fields": CATALOGUE_FIELDS, "courses": rows}, separators=(",",":"), ensure_ascii=False))
+
+print(f"✅ catalogue.json generated ({len(rows)} courses)")
+
+# --- INDEX.HTML ---
+# cards are rendered client-side from catalogue.json (see index.js)
+out.write(INDEX_HTML, """<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width,initial-scale=1.0">
   <title>Crit Courses</title>
   <link rel="stylesheet" href="style.css">
+  <link rel="preload" href="catalogue.json" as="fetch" crossorigin>
 </head>
 <body>
   <header>
@@ -127,25 +160,30 @@ with open(INDEX_HTML, "w", encoding="utf-8") as f:
   </header>
 
   <div class="filter-bar">
-    <label>Filter by State:</label>
-    <select id="stateFilter">
-      <option value="all">All</option>
-      {''.join(f'<option value="{s}">{s.replace("_"," ")}</option>' for s in sorted(states))}
+    <label for="stateFilter">State:</label>
+    <select id="stateFilter"><option value="all">All</option></select>
+    <label for="yearFilter">Year:</label>
+    <select id="yearFilter"><option value="all">All</option></select>
+    <label for="seriesFilter">Series:</label>
+    <select id="seriesFilter"><option value="all">All</option></select>
+    <label for="sortBy">Sort by:</label>
+    <select id="sortBy">
+      <option value="name">Name</option>
+      <option value="year">Year</option>
+      <option value="km">Lap Distance</option>
+      <option value="gain_m">Elevation Gain</option>
+      <option value="density">Climb Density</option>
+      <option value="avg_grad">Average Gradient</option>
+      <option value="max_grad">Max Gradient</option>
+      <option value="min_grad">Min Gradient</option>
     </select>
+    <button id="sortDir" type="button" aria-label="Sort direction">▲</button>
   </div>
 
-  <main class="card-container">
-    {''.join(cards)}
-  </main>
+  <p id="courseCount" class="course-count"></p>
+  <main class="card-container" id="cardGrid"></main>
 
-  <script>
-    document.getElementById('stateFilter').addEventListener('change', e => {{
-      const sel = e.target.value;
-      document.querySelectorAll('.course-card').forEach(c => {{
-        c.style.display = sel==='all' || c.dataset.state===sel ? '' : 'none';
-      }});
-    }});
-  </script>
+  <script src="index.js"></script>
 
   <footer style="text-align: center; padding: 1em; font-size: 0.8em; color: gray;">
     © 2025 Julia Hazenberg. All rights reserved. For informational purposes only.
@@ -181,8 +219,7 @@ for m in month_order:
     else:
         month_cards.append(f'<div class="month-card{highlight}"><h2>{m}</h2><p>No events</p></div>')
 
-with open(CALENDAR_HTML, "w", encoding="utf-8") as f:
-    f.write(f"""<!DOCTYPE html>
+out.write(CALENDAR_HTML, f"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
@@ -233,28 +270,26 @@ print("✅ calendar.html generated")
 
 # --- EVENT_MAP.HTML ---
 
-# Build the map and add one marker per crit
-m = folium.Map(location=[39.5, -98.35], zoom_start=4, tiles="OpenStreetMap")
-
-for loc in crit_locations:            # <-- crit_locations was already collected earlier
-    folium.Marker(
-        location=[loc["lat"], loc["lon"]],
+# One marker per crit, rendered into the precompiled event map page
+markers = [
+    map_template.marker(
+        loc["lat"], loc["lon"], icon="bicycle", color="green",
         tooltip=f"{loc['name']} {loc['year']}",
         popup=(
             f'<a href="courses/{loc["folder"]}/'
             f'{loc["raw"]}_crit_{loc["year"]}_details.html" target="_top">'
             f'Open course page</a>'
         ),
-        icon=folium.Icon(color="green", icon="bicycle", prefix="fa")
-    ).add_to(m)
+    )
+    for loc in crit_locations            # <-- crit_locations was already collected earlier
+]
 
 # Save the raw map to its own file
 EVENT_MAP_IFRAME = os.path.join(BASE_DIR, "event_map_map.html")
-m.save(EVENT_MAP_IFRAME)
+out.write(EVENT_MAP_IFRAME, map_template.render_event_map(markers))
 
 # Create a wrapper page with normal header/nav/footer
-with open(EVENT_MAP_HTML, "w", encoding="utf-8") as f:
-    f.write(f"""<!DOCTYPE html>
+out.write(EVENT_MAP_HTML, f"""<!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
@@ -283,3 +318,6 @@ with open(EVENT_MAP_HTML, "w", encoding="utf-8") as f:
 </html>""")
 
 print("✅ event_map.html generated (wrapper) + event_map_map.html (actual map)")
+
+# swap everything that changed into place
+out.commit()
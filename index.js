@@ -0,0 +1,180 @@
+// Course index: renders the card grid from catalogue.json.
+// Only the rows in (or near) the viewport are in the DOM, so the page stays
+// fast with thousands of courses; the rest of the grid is padding.
+(function () {
+  const grid = document.getElementById('cardGrid');
+  const count = document.getElementById('courseCount');
+  const stateFilter = document.getElementById('stateFilter');
+  const yearFilter = document.getElementById('yearFilter');
+  const seriesFilter = document.getElementById('seriesFilter');
+  const sortBy = document.getElementById('sortBy');
+  const sortDir = document.getElementById('sortDir');
+
+  const CARD_MIN_WIDTH = 320;  // matches .card-container minmax()
+  const CARD_HEIGHT = 340;     // matches .course-card height
+  const BUFFER_ROWS = 2;       // rows rendered above/below the viewport
+
+  let courses = [];
+  let visible = [];
+  let ascending = true;
+  let rendered = null;  // "first:last:cols" of what is currently in the DOM
+  let pending = false;
+  let nodes = new Map(); // folder -> card element currently in the grid
+
+  function addOptions(select, values) {
+    values.forEach(v => {
+      const opt = document.createElement('option');
+      opt.value = v;
+      opt.textContent = v;
+      select.appendChild(opt);
+    });
+  }
+
+  function unique(key) {
+    return [...new Set(courses.map(c => c[key]).filter(v => v !== ''))];
+  }
+
+  function fmt(value, digits, unit) {
+    return value === null ? '–' : value.toFixed(digits) + unit;
+  }
+
+  function el(tag, className, text) {
+    const node = document.createElement(tag);
+    if (className) node.className = className;
+    if (text !== undefined) node.textContent = text;
+    return node;
+  }
+
+  function createCard(c) {
+    const base = `courses/${encodeURIComponent(c.folder)}/${encodeURIComponent(c.raw)}_crit_${c.year}`;
+    const card = el('a', 'course-card');
+    card.href = `${base}_details.html`;
+
+    const header = el('div', 'card-header');
+    header.append(
+      el('h3', 'card-title', `${c.name} Crit`),
+      el('p', 'card-year', c.year),
+      el('p', 'card-stats', `${fmt(c.km, 2, ' km')} · ${fmt(c.gain_m, 0, ' m')} · ${fmt(c.density, 1, ' m/km')}`));
+
+    const map = el('div', 'card-map');
+    const frame = el('iframe');
+    frame.loading = 'lazy';
+    frame.src = `${base}_frontcard.html`;
+    map.appendChild(frame);
+
+    card.append(header, map);
+    return card;
+  }
+
+  function layout() {
+    const style = getComputedStyle(grid);
+    const gap = parseFloat(style.rowGap) || 0;
+    // top/bottom padding is overwritten below, the side padding is the original
+    const pad = parseFloat(style.paddingLeft) || 0;
+    const inner = grid.clientWidth - 2 * pad;
+    const cols = Math.max(1, Math.floor((inner + gap) / (CARD_MIN_WIDTH + gap)));
+    return { cols, pad, rowHeight: CARD_HEIGHT + gap };
+  }
+
+  // force: the filtered/sorted list changed, so throw away every card.
+  // Otherwise cards are kept by folder and only rows entering or leaving the
+  // window are added/removed, so on-screen iframes are never reloaded.
+  function render(force) {
+    pending = false;
+    const { cols, pad, rowHeight } = layout();
+    const rows = Math.ceil(visible.length / cols);
+    const top = grid.getBoundingClientRect().top + pad;
+    // clamp to the list: after a filter the old scroll offset may be past its end
+    const first = Math.min(Math.max(0, Math.floor(-top / rowHeight) - BUFFER_ROWS), Math.max(0, rows - 1));
+    const last = Math.max(first, Math.min(rows, Math.ceil((window.innerHeight - top) / rowHeight) + BUFFER_ROWS));
+    const key = `${first}:${last}:${cols}`;
+    if (!force && key === rendered) return;
+    rendered = key;
+
+    if (force) {
+      grid.replaceChildren();
+      nodes = new Map();
+    }
+
+    const wanted = visible.slice(first * cols, last * cols);
+    const keep = new Set(wanted.map(c => c.folder));
+    nodes.forEach((node, folder) => {
+      if (!keep.has(folder)) {
+        node.remove();
+        nodes.delete(folder);
+      }
+    });
+
+    // existing cards are already in list order; only insert the new ones
+    let ref = grid.firstChild;
+    wanted.forEach(c => {
+      let node = nodes.get(c.folder);
+      if (node === ref) {
+        ref = ref.nextSibling;
+        return;
+      }
+      if (!node) {
+        node = createCard(c);
+        nodes.set(c.folder, node);
+      }
+      grid.insertBefore(node, ref);
+    });
+
+    grid.style.paddingTop = `${pad + first * rowHeight}px`;
+    grid.style.paddingBottom = `${pad + Math.max(0, rows - last) * rowHeight}px`;
+  }
+
+  function schedule() {
+    if (pending) return;
+    pending = true;
+    requestAnimationFrame(() => render(false));
+  }
+
+  function update() {
+    const state = stateFilter.value;
+    const year = yearFilter.value;
+    const series = seriesFilter.value;
+    const key = sortBy.value;
+    const dir = ascending ? 1 : -1;
+
+    visible = courses.filter(c =>
+      (state === 'all' || c.state === state) &&
+      (year === 'all' || String(c.year) === year) &&
+      (series === 'all' || c.series === series));
+
+    visible.sort((a, b) => {
+      const x = a[key], y = b[key];
+      if (x === y) return a.name.localeCompare(b.name);
+      if (x === null) return 1;  // missing stats always last
+      if (y === null) return -1;
+      return (typeof x === 'string' ? x.localeCompare(y) : x - y) * dir;
+    });
+
+    count.textContent = `${visible.length} of ${courses.length} courses`;
+    // new results start at the top of the grid, not at the old scroll offset
+    if (grid.getBoundingClientRect().top < 0) grid.scrollIntoView();
+    render(true);
+  }
+
+  fetch('catalogue.json')
+    .then(res => res.json())
+    .then(data => {
+      courses = data.courses.map(row =>
+        Object.fromEntries(data.fields.map((f, i) => [f, row[i]])));
+
+      addOptions(stateFilter, unique('state').sort());
+      addOptions(yearFilter, unique('year').sort((a, b) => b - a));
+      addOptions(seriesFilter, unique('series').sort());
+      update();
+    });
+
+  [stateFilter, yearFilter, seriesFilter, sortBy].forEach(el =>
+    el.addEventListener('change', update));
+  sortDir.addEventListener('click', () => {
+    ascending = !ascending;
+    sortDir.textContent = ascending ? '▲' : '▼';
+    update();
+  });
+  window.addEventListener('scroll', schedule, { passive: true });
+  window.addEventListener('resize', schedule);
+})();
@@ -0,0 +1,91 @@
+import os
+import atexit
+import shutil
+import hashlib
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# Output layer every generator writes through.
+# Files are compared with what is already on disk (sha256) and only changed
+# ones are staged into a temp build dir by a background thread pool. Nothing
+# touches the site until commit(), which moves the staged files into place
+# with os.replace (atomic per file), so an interrupted build leaves the old
+# pages intact and unchanged pages keep their mtime for the deploy commit.
+
+def _digest(data):
+    return hashlib.sha256(data).digest()
+
+def _file_digest(path):
+    try:
+        with open(path, "rb") as f:
+            return _digest(f.read())
+    except FileNotFoundError:
+        return None
+
+
+class SiteOutput:
+    def __init__(self, base_dir, workers=8):
+        self.base_dir = base_dir
+        # stage inside base_dir so os.replace never crosses filesystems
+        self.staging = tempfile.mkdtemp(prefix=".build-", dir=base_dir)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.lock = threading.Lock()
+        self.futures = []
+        self.seq = 0
+        self.latest = {}    # target -> seq of its last write; only that one counts
+        self.staged = {}    # target -> staged path
+        self.skipped = set()
+        self.done = False
+        atexit.register(self.discard)
+
+    def write(self, path, content):
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        target = os.path.abspath(path)
+        with self.lock:
+            self.seq += 1
+            self.latest[target] = seq = self.seq
+        self.futures.append(self.pool.submit(self._stage, target, seq, data))
+
+    def _stage(self, target, seq, data):
+        unchanged = _file_digest(target) == _digest(data)
+        staged = os.path.join(self.staging, str(seq))
+        if not unchanged:
+            with open(staged, "wb") as f:
+                f.write(data)
+        with self.lock:
+            if self.latest[target] != seq:
+                return  # superseded by a later write to the same file
+            if unchanged:
+                self.skipped.add(target)
+                self.staged.pop(target, None)
+            else:
+                self.skipped.discard(target)
+                self.staged[target] = staged
+
+    def flush(self):
+        # wait for queued writes; re-raises the first staging error
+        futures, self.futures = self.futures, []
+        for fut in futures:
+            fut.result()
+
+    def commit(self):
+        try:
+            self.flush()
+        except BaseException:
+            self.discard()
+            raise
+        self.pool.shutdown()
+        for target, staged in self.staged.items():
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.replace(staged, target)
+        self.done = True
+        shutil.rmtree(self.staging, ignore_errors=True)
+        print(f"✅ output: {len(self.staged)} files written, {len(self.skipped)} unchanged")
+
+    def discard(self):
+        if self.done:
+            return
+        self.done = True
+        self.pool.shutdown(cancel_futures=True)
+        shutil.rmtree(self.staging, ignore_errors=True)
@@ -1,16 +1,14 @@
 import gpxpy
-import folium
-import branca
 import json
 import os
 from geopy.distance import geodesic
-from folium.plugins import PolyLineTextPath
 from scipy.signal import savgol_filter
 import numpy as np
 from geopy.geocoders import Nominatim
+from templates import map_template
 
 
-def process_course(gpx_path, output_dir, critname, year):
+def process_course(gpx_path, output_dir, critname, year, out):
     with open(gpx_path, encoding='utf-8') as gpx_file:
         gpx = gpxpy.parse(gpx_file)
         
@@ -30,8 +28,7 @@ def process_course(gpx_path, output_dir, critname, year):
           track.type = None
           track.number = None
             
-    with open(os.path.join(output_dir, f"{critname}_crit_{year}.gpx"), "w", encoding="utf-8") as out_gpx:
-        out_gpx.write(gpx.to_xml())
+    out.write(os.path.join(output_dir, f"{critname}_crit_{year}.gpx"), gpx.to_xml())
 
 
     points = [(p.latitude, p.longitude, p.elevation)
@@ -96,41 +93,24 @@ def process_course(gpx_path, output_dir, critname, year):
     if location and 'state' in location.raw['address']:
       state = location.raw['address']['state']
 
-    m = folium.Map(location=[lat_center, lon_center], zoom_start=17)
-    color_scale = branca.colormap.StepColormap(
-        colors=["darkgreen", "lightgreen", "yellow", "orange", "red", "darkred"],
-        index=[-10, -2, 2, 5, 10, 20],
-        vmin=-10, vmax=20, caption="Gradient (%)"
-    )
-
+    # Per-segment gradients, coloured and grouped into runs for the map page
+    segment_gradients = []
     for i in range(len(coords) - 1):
         elev_diff = elevs[i + 1] - elevs[i]
         horiz_dist = geodesic(coords[i], coords[i + 1]).meters
-        gradient = (elev_diff / horiz_dist) * 100 if horiz_dist else 0
-        color = "gray" if abs(gradient) < 0.01 else color_scale(gradient)
-
-        segment = folium.PolyLine([coords[i], coords[i + 1]], color=color, weight=8, opacity=0.9,
-                                  tooltip=f"Gradient: {gradient:.1f}%").add_to(m)
-        
-        # Add arrow pointing in direction of crit course
-        PolyLineTextPath(
-            segment,
-            '➤',
-            repeat=True,
-            offset=0,
-            attributes={'fill': color, 'font-weight': 'bold', 'font-size': '20px'}
-        ).add_to(m)
-
-
-
-    folium.Marker(coords[0], popup="Start",
-                  icon=folium.Icon(icon='bicycle', color='green', prefix='fa')).add_to(m)
-    folium.Marker(coords[-1], popup="End",
-                  icon=folium.Icon(icon='flag', color='red', prefix='fa')).add_to(m)
-    color_scale.add_to(m)
-    m.fit_bounds([[min(p[0] for p in coords), min(p[1] for p in coords)],
-                  [max(p[0] for p in coords), max(p[1] for p in coords)]])
-    m.save(os.path.join(output_dir, f"{critname}_crit_{year}_map.html"))
+        segment_gradients.append((elev_diff / horiz_dist) * 100 if horiz_dist else 0)
+
+    markers = [
+        map_template.marker(*coords[0], icon="bicycle", color="green", popup="Start"),
+        map_template.marker(*coords[-1], icon="flag", color="red", popup="End"),
+    ]
+    map_html = map_template.render_course_map(
+        center=(lat_center, lon_center),
+        bounds=map_template.bounds_of(coords),
+        runs=map_template.gradient_runs(coords, segment_gradients),
+        markers=markers,
+    )
+    out.write(os.path.join(output_dir, f"{critname}_crit_{year}_map.html"), map_html)
 
     def is_clockwise(coords):
         # formula to compute signed area (shoelace)
@@ -153,8 +133,8 @@ def process_course(gpx_path, output_dir, critname, year):
         "distance_miles": cumulative_dist,
         "elevation_feet": smoothed.tolist()
     }
-    with open(os.path.join(output_dir, f"{critname}_crit_{year}_elevation_data.json"), "w") as f:
-        json.dump(elevation_data, f, indent=2)
+    out.write(os.path.join(output_dir, f"{critname}_crit_{year}_elevation_data.json"),
+              json.dumps(elevation_data, indent=2))
 
     # Stats
     total_dist = sum(geodesic(coords[i], coords[i + 1]).meters for i in range(len(coords) - 1))
@@ -185,8 +165,7 @@ def process_course(gpx_path, output_dir, critname, year):
     }
     
     print(state)
-    with open(os.path.join(output_dir, f"{critname}_crit_{year}_stats.json"), "w") as f:
-        json.dump(stats, f, indent=2)
+    out.write(os.path.join(output_dir, f"{critname}_crit_{year}_stats.json"), json.dumps(stats, indent=2))
 
     # HTML Output
     html_file = os.path.join(output_dir, f"{critname}_crit_{year}_details.html")
@@ -287,5 +266,6 @@ def process_course(gpx_path, output_dir, critname, year):
 </body>
 </html>"""
 
-    with open(html_file, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    out.write(html_file, html_content)
+
+    return stats
@@ -1,7 +1,7 @@
 import gpxpy
 from geopy.distance import geodesic
-import folium
 import os
+from templates import map_template
 
 def extract_gpx_points(gpx):
     if gpx.tracks:
@@ -25,7 +25,7 @@ def get_crit_location(gpx_path):
     else:
         return None, None
 
-def process_frontcard(gpx_path, output_dir, critname, year):
+def process_frontcard(gpx_path, output_dir, critname, year, out):
     with open(gpx_path, encoding="utf-8") as gpx_file:
         gpx = gpxpy.parse(gpx_file)
 
@@ -62,79 +62,15 @@ def process_frontcard(gpx_path, output_dir, critname, year):
     longitudes = [c[1] for c in lap_coords]
     bounds = [[min(latitudes), min(longitudes)], [max(latitudes), max(longitudes)]]
 
-    # Create fully static map so it is not annoying when scrolling on phone
-    m = folium.Map(
-        location=[sum(latitudes) / len(latitudes), sum(longitudes) / len(longitudes)],
-        zoom_start=18,
-        tiles="OpenStreetMap",
-        zoom_control=False,
-        scrollWheelZoom=False,
-        dragging=False,
-        prefer_canvas=True,
+    # Fully static map so it is not annoying when scrolling on phone
+    frontcard_html = map_template.render_frontcard(
+        center=(sum(latitudes) / len(latitudes), sum(longitudes) / len(longitudes)),
+        bounds=bounds,
+        path=lap_coords,
+        is_toad="toad" in critname.lower(),
     )
-    m.fit_bounds(bounds, max_zoom=17, padding=(50, 50))
-
-    folium.PolyLine(lap_coords, color="darkgreen", weight=6, opacity=0.9).add_to(m)
-
-    # Disable all map interactivity using JS (annoying when scrolling)
-    m.get_root().html.add_child(folium.Element("""
-    <script>
-        var map = document.getElementsByClassName('folium-map')[0]._leaflet_map;
-        map.touchZoom.disable();
-        map.doubleClickZoom.disable();
-        map.scrollWheelZoom.disable();
-        map.boxZoom.disable();
-        map.keyboard.disable();
-        map.dragging.disable();
-        if (map.tap) map.tap.disable();
-    </script>
-    """))
-
-    # Render map
-    map_html = m.get_root().render()
-
-    # Label if it's ToAD
-    is_toad = "toad" in critname.lower()
-
-    frontcard_html = f"""
-    <html>
-        <head>
-            <link rel="stylesheet" type="text/css" href="style.css">
-            <style>
-                .toad-label {{
-                    position: absolute;
-                    top: 8px;
-                    left: 8px;
-                    background-color: #28a745;
-                    color: white;
-                    font-size: 0.8rem;
-                    padding: 4px 8px;
-                    border-radius: 4px;
-                    font-weight: bold;
-                    font-family: sans-serif;
-                    z-index: 1000;
-                }}
-                .map-wrapper {{
-                    position: relative;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="map-wrapper">
-                {"<div class='toad-label'>ToAD</div>" if is_toad else ""}
-                {map_html}
-            </div>
-        </body>
-    </html>
-    """
 
     # Save file
     frontcard_filename = f"{critname}_crit_{year}_frontcard.html"
     frontcard_path = os.path.join(output_dir, frontcard_filename)
-
-    os.makedirs(output_dir, exist_ok=True)
-
-    with open(frontcard_path, "w", encoding="utf-8") as f:
-        f.write(frontcard_html)
-
-    print(f"✅ Saved frontcard map to {frontcard_path}")
+    out.write(frontcard_path, frontcard_html)
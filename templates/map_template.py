@@ -0,0 +1,197 @@
+import json
+from bisect import bisect_right
+from string import Template
+
+# Leaflet map pages (course map, frontcard, event map).
+# The page skeletons below are compiled once when this module is imported, so
+# each course only pays for json.dumps + substitute() instead of building and
+# rendering a folium object graph. JS inside the templates avoids "$" so it
+# can't clash with string.Template placeholders.
+
+LEAFLET_HEAD = """
+    <meta http-equiv="content-type" content="text/html; charset=UTF-8" />
+    <meta name="viewport" content="width=device-width, initial-scale=1.0, maximum-scale=1.0, user-scalable=no" />
+    <script src="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.js"></script>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/leaflet@1.9.3/dist/leaflet.css"/>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/bootstrap@5.2.2/dist/css/bootstrap.min.css"/>
+    <link rel="stylesheet" href="https://cdn.jsdelivr.net/npm/@fortawesome/fontawesome-free@6.2.0/css/all.min.css"/>
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/Leaflet.awesome-markers/2.0.2/leaflet.awesome-markers.css"/>
+    <style>
+        html, body { width: 100%; height: 100%; margin: 0; padding: 0; }
+        #map { position: relative; width: 100%; height: 100%; }
+        .leaflet-container { font-size: 1rem; }
+    </style>"""
+
+# shared JS helpers: OSM tiles + awesome-marker icons
+LEAFLET_JS = """
+        function addTiles(map) {
+            L.tileLayer("https://tile.openstreetmap.org/{z}/{x}/{y}.png", {
+                maxZoom: 19,
+                attribution: '&copy; <a href="https://www.openstreetmap.org/copyright">OpenStreetMap</a> contributors'
+            }).addTo(map);
+        }
+        function addMarker(map, m) {
+            var marker = L.marker([m.lat, m.lon], {
+                icon: L.AwesomeMarkers.icon({markerColor: m.color, iconColor: "white", icon: m.icon, prefix: "fa"})
+            }).addTo(map);
+            if (m.popup) marker.bindPopup(m.popup, {maxWidth: "100%"});
+            if (m.tooltip) marker.bindTooltip(m.tooltip, {sticky: true});
+        }"""
+
+# gradient colour scale (same steps as the old branca StepColormap)
+GRADIENT_INDEX  = [-10, -2, 2, 5, 10, 20]
+GRADIENT_COLORS = ["#006400", "#90ee90", "#ffff00", "#ffa500", "#ff0000", "#8b0000"]
+
+def gradient_color(gradient):
+    if abs(gradient) < 0.01:
+        return "gray"
+    i = bisect_right(GRADIENT_INDEX, gradient)
+    return GRADIENT_COLORS[min(max(i - 1, 0), len(GRADIENT_COLORS) - 1)]
+
+def _legend_html():
+    span = GRADIENT_INDEX[-1] - GRADIENT_INDEX[0]
+    steps = "".join(
+        f'<div style="flex: {(hi - lo) / span:.4f}; background: {color};"></div>'
+        for lo, hi, color in zip(GRADIENT_INDEX, GRADIENT_INDEX[1:], GRADIENT_COLORS)
+    )
+    ticks = "".join(
+        f'<span style="position: absolute; left: {(v - GRADIENT_INDEX[0]) / span * 100:.2f}%; transform: translateX(-50%);">{v}</span>'
+        for v in GRADIENT_INDEX
+    )
+    return f"""<div class="legend">
+            <div class="legend-caption">Gradient (%)</div>
+            <div class="legend-ticks">{ticks}</div>
+            <div class="legend-bar">{steps}</div>
+        </div>"""
+
+COURSE_MAP_PAGE = Template(Template("""<!DOCTYPE html>
+<html>
+<head>$leaflet_head
+    <script src="https://cdn.jsdelivr.net/npm/leaflet-textpath@1.2.3/leaflet.textpath.min.js"></script>
+    <style>
+        .legend { position: absolute; top: 10px; right: 10px; z-index: 1000; width: 400px; max-width: 80%;
+                  padding: 4px 8px; background: rgba(255, 255, 255, 0.8); font-size: 0.75rem; }
+        .legend-caption { text-align: center; }
+        .legend-ticks { position: relative; height: 1.1em; margin: 0 8px; }
+        .legend-bar { display: flex; height: 10px; margin: 0 8px; }
+    </style>
+</head>
+<body>
+    <div id="map"></div>
+    $legend
+    <script>$leaflet_js
+        var course = $$payload;
+        var map = L.map("map", {center: course.center, zoom: 17});
+        addTiles(map);
+        course.runs.forEach(function (run) {
+            for (var i = 0; i < run.grades.length; i++) {
+                var segment = L.polyline([run.path[i], run.path[i + 1]], {color: run.color, weight: 8, opacity: 0.9})
+                    .bindTooltip("Gradient: " + run.grades[i].toFixed(1) + "%", {sticky: true})
+                    .addTo(map);
+                // arrow pointing in direction of crit course
+                segment.setText("\\u27a4", {repeat: true, offset: 0,
+                    attributes: {"fill": run.color, "font-weight": "bold", "font-size": "20px"}});
+            }
+        });
+        course.markers.forEach(function (m) { addMarker(map, m); });
+        map.fitBounds(course.bounds);
+    </script>
+</body>
+</html>""").substitute(leaflet_head=LEAFLET_HEAD, leaflet_js=LEAFLET_JS, legend=_legend_html()))
+
+# static map so it is not annoying when scrolling on phone
+FRONTCARD_PAGE = Template(Template("""<!DOCTYPE html>
+<html>
+<head>$leaflet_head
+    <link rel="stylesheet" type="text/css" href="style.css">
+    <style>
+        .toad-label {
+            position: absolute;
+            top: 8px;
+            left: 8px;
+            background-color: #28a745;
+            color: white;
+            font-size: 0.8rem;
+            padding: 4px 8px;
+            border-radius: 4px;
+            font-weight: bold;
+            font-family: sans-serif;
+            z-index: 1000;
+        }
+        .map-wrapper {
+            position: relative;
+            height: 100%;
+        }
+    </style>
+</head>
+<body>
+    <div class="map-wrapper">
+        $$label
+        <div id="map"></div>
+    </div>
+    <script>$leaflet_js
+        var course = $$payload;
+        var map = L.map("map", {
+            center: course.center, zoom: 18, preferCanvas: true, zoomControl: false,
+            dragging: false, touchZoom: false, doubleClickZoom: false, scrollWheelZoom: false,
+            boxZoom: false, keyboard: false, tap: false
+        });
+        addTiles(map);
+        map.fitBounds(course.bounds, {maxZoom: 17, padding: [50, 50]});
+        L.polyline(course.path, {color: "darkgreen", weight: 6, opacity: 0.9}).addTo(map);
+    </script>
+</body>
+</html>""").substitute(leaflet_head=LEAFLET_HEAD, leaflet_js=LEAFLET_JS))
+
+EVENT_MAP_PAGE = Template(Template("""<!DOCTYPE html>
+<html>
+<head>$leaflet_head
+</head>
+<body>
+    <div id="map"></div>
+    <script>$leaflet_js
+        var markers = $$payload;
+        var map = L.map("map", {center: [39.5, -98.35], zoom: 4});
+        addTiles(map);
+        markers.forEach(function (m) { addMarker(map, m); });
+    </script>
+</body>
+</html>""").substitute(leaflet_head=LEAFLET_HEAD, leaflet_js=LEAFLET_JS))
+
+
+def to_js(data):
+    # JSON is valid JS; escape "</" so popup HTML can't close the <script> tag
+    return json.dumps(data, separators=(",", ":")).replace("</", "<\\/")
+
+def marker(lat, lon, icon, color, popup=None, tooltip=None):
+    return {"lat": lat, "lon": lon, "icon": icon, "color": color, "popup": popup, "tooltip": tooltip}
+
+def bounds_of(coords):
+    return [[min(p[0] for p in coords), min(p[1] for p in coords)],
+            [max(p[0] for p in coords), max(p[1] for p in coords)]]
+
+def gradient_runs(coords, gradients):
+    """Group consecutive segments with the same colour into one polyline run."""
+    runs = []
+    for i, gradient in enumerate(gradients):
+        color = gradient_color(gradient)
+        if not runs or runs[-1]["color"] != color:
+            runs.append({"color": color, "path": [list(coords[i])], "grades": []})
+        runs[-1]["path"].append(list(coords[i + 1]))
+        runs[-1]["grades"].append(round(gradient, 1))
+    return runs
+
+def render_course_map(center, bounds, runs, markers):
+    return COURSE_MAP_PAGE.substitute(payload=to_js({
+        "center": list(center), "bounds": bounds, "runs": runs, "markers": markers
+    }))
+
+def render_frontcard(center, bounds, path, is_toad):
+    return FRONTCARD_PAGE.substitute(
+        label="<div class='toad-label'>ToAD</div>" if is_toad else "",
+        payload=to_js({"center": list(center), "bounds": bounds, "path": [list(p) for p in path]}),
+    )
+
+def render_event_map(markers):
+    return EVENT_MAP_PAGE.substitute(payload=to_js(markers))